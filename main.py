@@ -2,15 +2,19 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from selenium.webdriver.firefox.options import Options
 from time import sleep, time
+import asyncio
 import csv
+import io
 import os
 import random
+import re
 import json
-from datetime import datetime
+from datetime import datetime, date, timedelta
 import psycopg2
+import httpx
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,11 +25,37 @@ load_dotenv()
 OUTPUT_FILE = "deed_2026_v4.csv"
 STATE_FILE = "scraper_state.json"
 URL_TEMPLATE = "https://bexar.tx.publicsearch.us/results?department=RP&docTypes=DEED&limit=250&recordedDateRange={start_date}%2C{end_date}&searchType=advancedSearch&sort=desc&sortBy=recordedDate"
+# The XHR endpoint behind the results table. One GET = 250 structured rows,
+# no browser/DOM/Marionette in the loop.
+API_URL = "https://bexar.tx.publicsearch.us/api/search"
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0"
 
 START_DATE_FIXED = "18000101"
 DEFAULT_END_DATE = "20260121"
 WINDOW_YEARS = int(os.environ.get("WINDOW_YEARS", "10"))
 
+# Optional sharding: N workers each own a non-overlapping slice of
+# 1800..DEFAULT_END_DATE plus their own state file, and push to the same
+# DB (the doc_number constraint absorbs any boundary overlap). WINDOW_ID 0
+# takes the newest years; unset = one worker over the full range.
+WINDOW_ID = os.environ.get("WINDOW_ID")
+WINDOW_COUNT = int(os.environ.get("WINDOW_COUNT", "1"))
+
+SHARD_START_DATE = START_DATE_FIXED
+SHARD_END_DATE = DEFAULT_END_DATE
+if WINDOW_ID is not None and WINDOW_COUNT > 1:
+    _wid = int(WINDOW_ID) % WINDOW_COUNT
+    _first_year = int(START_DATE_FIXED[:4])
+    _last_year = int(DEFAULT_END_DATE[:4])
+    _span = -(-(_last_year - _first_year + 1) // WINDOW_COUNT)
+    _hi = _last_year - _wid * _span
+    _lo = max(_first_year, _hi - _span + 1)
+    SHARD_START_DATE = f"{_lo}0101"
+    if _wid > 0:
+        SHARD_END_DATE = f"{_hi}1231"
+    STATE_FILE = f"scraper_state_{_wid}.json"
+
 # Environment
 HEADLESS = os.environ.get("HEADLESS", "false").lower() == "true"
 IS_GITHUB_ACTIONS = os.environ.get("GITHUB_ACTIONS", "false").lower() == "true"
@@ -36,6 +66,14 @@ PROXY_HOST = "127.0.0.1"
 PROXY_PORT = "9050"
 USE_PROXY = os.environ.get("USE_PROXY", "false").lower() == "true"
 
+# Scrape via the JSON API by default; set USE_API=false to fall back to
+# the full browser loop if the endpoint changes or starts blocking us.
+USE_API = os.environ.get("USE_API", "true").lower() == "true"
+
+# How many page fetches to keep in flight at once (API mode). The work is
+# pure network RTT, so a wave of N offsets finishes in ~1 RTT instead of N.
+ASYNC_CONCURRENCY = int(os.environ.get("ASYNC_CONCURRENCY", "6"))
+
 # Delays
 MIN_DELAY = 3
 MAX_DELAY = 7
@@ -47,8 +85,12 @@ BREAK_DURATION_MAX = 180
 # 3 hours = 180 mins. Conservative 1 min/page = 180 pages.
 MAX_PAGES_PER_SESSION = 180 if IS_GITHUB_ACTIONS else 1000
 RECORDS_PER_PAGE = 250
-OFFSET_LIMIT = 9500 
-BATCH_SIZE = 1000
+OFFSET_LIMIT = 9500
+# One page per flush: a 250-row COPY is single-digit ms, and losing at
+# most a page's worth of rows on a crash keeps the date cursor honest
+BATCH_SIZE = 250
+SEEN_DOCS_MAX = 20000
+SAVE_EVERY_N_PAGES = 5
 
 # =============================================================================
 # COLUMN MAPPING
@@ -74,106 +116,198 @@ FIELDNAMES = [
     'County_Block', 'Property_Address'
 ]
 
+# JSON keys in the API response -> our field names
+API_FIELD_MAP = {
+    'Grantor': 'grantors',
+    'Grantee': 'grantees',
+    'Doc_Type': 'docType',
+    'Recorded_Date': 'recordedDate',
+    'Doc_Number': 'docNumber',
+    'Book_Volume_Page': 'bookVolumePage',
+    'Legal_Description': 'legalDescription',
+    'Lot': 'lot',
+    'Block': 'block',
+    'NCB': 'ncb',
+    'County_Block': 'countyBlock',
+    'Property_Address': 'propertyAddress'
+}
+
 # =============================================================================
 # DATABASE FUNCTIONS
 # =============================================================================
 
+# One connection for the whole session. Reconnecting per call pays a full
+# TCP + TLS + startup handshake every flush, which on cloud Postgres costs
+# more than the INSERT itself.
+_CONN = None
+
+def get_conn():
+    global _CONN
+    if _CONN is None or _CONN.closed:
+        _CONN = psycopg2.connect(DATABASE_URL)
+    return _CONN
+
+def close_conn():
+    global _CONN
+    if _CONN is not None:
+        try: _CONN.close()
+        except: pass
+        _CONN = None
+
 def init_db():
     if not DATABASE_URL:
         print("⚠️ No DATABASE_URL found. Skipping DB init.")
         return
-        
-    try:
-        conn = psycopg2.connect(DATABASE_URL)
-        cur = conn.cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS land_records (
-                id SERIAL PRIMARY KEY,
-                doc_number TEXT UNIQUE,
-                grantor TEXT,
-                grantee TEXT,
-                doc_type TEXT,
-                recorded_date DATE,
-                book_volume_page TEXT,
-                legal_description TEXT,
-                lot TEXT,
-                block TEXT,
-                ncb TEXT,
-                county_block TEXT,
-                property_address TEXT,
-                created_at TIMESTAMP DEFAULT NOW()
-            );
-        """)
-        conn.commit()
-        cur.close()
-        conn.close()
-        print("✓ Database initialized.")
-    except Exception as e:
-        print(f"❌ DB Init failed: {e}")
+
+    for attempt in (1, 2):
+        try:
+            conn = get_conn()
+            with conn, conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS land_records (
+                        id SERIAL PRIMARY KEY,
+                        doc_number TEXT UNIQUE,
+                        grantor TEXT,
+                        grantee TEXT,
+                        doc_type TEXT,
+                        recorded_date DATE,
+                        book_volume_page TEXT,
+                        legal_description TEXT,
+                        lot TEXT,
+                        block TEXT,
+                        ncb TEXT,
+                        county_block TEXT,
+                        property_address TEXT,
+                        created_at TIMESTAMP DEFAULT NOW()
+                    );
+                """)
+                # UNLOGGED ingest table: scrape flushes land here with no
+                # WAL writes; promote_records() merges into land_records
+                # at session end. No unique constraint — dups are fine.
+                cur.execute("""
+                    CREATE UNLOGGED TABLE IF NOT EXISTS land_records_raw
+                    (LIKE land_records INCLUDING DEFAULTS);
+                """)
+            print("✓ Database initialized.")
+            return
+        except psycopg2.OperationalError as e:
+            close_conn()
+            if attempt == 2:
+                print(f"❌ DB Init failed: {e}")
+        except Exception as e:
+            print(f"❌ DB Init failed: {e}")
+            return
+
+def promote_records():
+    """Merge the raw ingest table into land_records, then clear it.
+
+    Runs once per session; a crash beforehand just leaves rows in raw
+    for the next session's promote to pick up. The DELETE ... RETURNING
+    CTE moves only rows visible to this worker's snapshot, so sharded
+    workers flushing into the shared raw table concurrently never lose
+    rows the way an INSERT-then-TRUNCATE would.
+    """
+    if not DATABASE_URL:
+        return
+
+    for attempt in (1, 2):
+        try:
+            conn = get_conn()
+            with conn, conn.cursor() as cur:
+                cur.execute(f"""
+                    WITH moved AS (
+                        DELETE FROM land_records_raw
+                        RETURNING {DB_COL_LIST}
+                    )
+                    INSERT INTO land_records ({DB_COL_LIST})
+                    SELECT DISTINCT ON (doc_number) {DB_COL_LIST}
+                    FROM moved
+                    ORDER BY doc_number
+                    ON CONFLICT (doc_number) DO NOTHING;
+                """)
+                promoted = cur.rowcount
+            print(f"📦 Promoted {promoted} new records to land_records.")
+            return
+        except psycopg2.OperationalError as e:
+            close_conn()
+            if attempt == 2:
+                print(f"❌ Promote failed: {e}")
+        except Exception as e:
+            print(f"❌ Promote failed: {e}")
+            return
 
 def get_db_stats():
     """Returns (count, min_date) from DB"""
     if not DATABASE_URL:
         return 0, None
-        
-    try:
-        conn = psycopg2.connect(DATABASE_URL)
-        cur = conn.cursor()
-        
-        cur.execute("SELECT COUNT(*) FROM land_records;")
-        count = cur.fetchone()[0]
-        
-        cur.execute("SELECT MIN(recorded_date) FROM land_records;")
-        min_date = cur.fetchone()[0]
-        
-        cur.close()
-        conn.close()
-        
-        # Format date straight away if exists
-        formatted_date = None
-        if min_date:
-            formatted_date = min_date.strftime("%Y%m%d")
-            
-        return count, formatted_date
-    except Exception as e:
-        print(f"❌ DB Stats failed: {e}")
-        return 0, None
+
+    for attempt in (1, 2):
+        try:
+            conn = get_conn()
+            with conn, conn.cursor() as cur:
+                # Both aggregates come out of one scan / one round-trip
+                cur.execute("SELECT COUNT(*), MIN(recorded_date) FROM land_records;")
+                count, min_date = cur.fetchone()
+
+            # Format date straight away if exists
+            formatted_date = None
+            if min_date:
+                formatted_date = min_date.strftime("%Y%m%d")
+
+            return count, formatted_date
+        except psycopg2.OperationalError as e:
+            close_conn()
+            if attempt == 2:
+                print(f"❌ DB Stats failed: {e}")
+        except Exception as e:
+            print(f"❌ DB Stats failed: {e}")
+            break
+    return 0, None
+
+DB_COLUMNS = (
+    'doc_number', 'grantor', 'grantee', 'doc_type', 'recorded_date',
+    'book_volume_page', 'legal_description', 'lot', 'block', 'ncb',
+    'county_block', 'property_address'
+)
+DB_COL_LIST = ", ".join(DB_COLUMNS)
+COPY_SQL = f"COPY land_records_raw({DB_COL_LIST}) FROM STDIN WITH (FORMAT csv, NULL '')"
 
 def batch_push_to_db(records):
+    """Push a {doc_number: record} batch. Keyed dict = free in-batch dedup."""
     if not DATABASE_URL or not records:
         return
 
-    try:
-        conn = psycopg2.connect(DATABASE_URL)
-        cur = conn.cursor()
-        
-        args_list = []
-        for r in records:
-            r_date = None
-            try:
-                if r.get('Recorded_Date'):
-                    r_date = datetime.strptime(r['Recorded_Date'], "%m/%d/%Y").strftime("%Y-%m-%d")
-            except: pass
-            
-            args_list.append((
-                r.get('Doc_Number'), r.get('Grantor'), r.get('Grantee'), r.get('Doc_Type'),
-                r_date, r.get('Book_Volume_Page'), r.get('Legal_Description'),
-                r.get('Lot'), r.get('Block'), r.get('NCB'), r.get('County_Block'), r.get('Property_Address')
-            ))
-            
-        query = """
-            INSERT INTO land_records 
-            (doc_number, grantor, grantee, doc_type, recorded_date, book_volume_page, legal_description, lot, block, ncb, county_block, property_address)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (doc_number) DO NOTHING;
-        """
-        cur.executemany(query, args_list)
-        conn.commit()
-        cur.close()
-        conn.close()
-        print(f"🚀 Synced {len(records)} records to DB.")
-    except Exception as e:
-        print(f"❌ DB Push failed: {e}")
+    # COPY into the UNLOGGED raw table is the whole flush: bulk protocol,
+    # no per-row parse/bind, and no WAL for heap or index. Dedup happens
+    # once at session end when promote_records() merges into the
+    # canonical table.
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for r in records.values():
+        # Date was already parsed at scrape time; flush is pure tuple work
+        r_date = r.get('Recorded_Date_ISO') or ""
+
+        writer.writerow((
+            r.get('Doc_Number'), r.get('Grantor'), r.get('Grantee'), r.get('Doc_Type'),
+            r_date, r.get('Book_Volume_Page'), r.get('Legal_Description'),
+            r.get('Lot'), r.get('Block'), r.get('NCB'), r.get('County_Block'), r.get('Property_Address')
+        ))
+
+    for attempt in (1, 2):
+        try:
+            buf.seek(0)
+            conn = get_conn()
+            with conn, conn.cursor() as cur:
+                cur.copy_expert(COPY_SQL, buf)
+            print(f"🚀 Synced {len(records)} records to DB.")
+            return
+        except psycopg2.OperationalError as e:
+            close_conn()
+            if attempt == 2:
+                print(f"❌ DB Push failed: {e}")
+        except Exception as e:
+            print(f"❌ DB Push failed: {e}")
+            return
 
 # =============================================================================
 # STATE & HELPERS
@@ -185,25 +319,47 @@ def load_state():
             with open(STATE_FILE, 'r') as f:
                 return json.load(f)
         except: pass
-    return {'current_end_date': DEFAULT_END_DATE, 'current_offset': 0}
+    return {'current_end_date': SHARD_END_DATE, 'current_offset': 0}
 
 def save_state(end_date, offset):
     state = {'current_end_date': end_date, 'current_offset': offset, 'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-    with open(STATE_FILE, 'w') as f:
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, 'w') as f:
         json.dump(state, f, indent=2)
+    # Atomic rename — a crash mid-write can never leave a truncated file
+    # for load_state to silently discard
+    os.replace(tmp, STATE_FILE)
 
-MIN_START_DATE = datetime.strptime(START_DATE_FIXED, "%Y%m%d")
+_save_counter = 0
 
+def maybe_save_state(end_date, offset):
+    """Throttled save for the hot loop: every SAVE_EVERY_N_PAGES calls.
 
-def random_delay():
-    sleep(random.uniform(MIN_DELAY, MAX_DELAY))
+    A crash costs at most a few pages of rework (dedup absorbs the
+    replay), and the unconditional saves at session exit still run.
+    """
+    global _save_counter
+    _save_counter += 1
+    if _save_counter % SAVE_EVERY_N_PAGES == 0:
+        save_state(end_date, offset)
 
+# Floor for this worker's window (the shard start when sharded)
+MIN_START_DATE = datetime.strptime(SHARD_START_DATE, "%Y%m%d")
+
+
+def previous_day(date_str):
+    """The day before date_str, clamped to this worker's shard floor."""
+    try:
+        d = datetime.strptime(date_str, "%Y%m%d") - timedelta(days=1)
+    except ValueError:
+        return SHARD_START_DATE
+    return max(d, MIN_START_DATE).strftime("%Y%m%d")
 
 def get_start_date(end_date_str: str) -> str:
     try:
         end_date = datetime.strptime(end_date_str, "%Y%m%d")
     except ValueError:
-        return START_DATE_FIXED
+        return SHARD_START_DATE
 
     target_year = max(end_date.year - WINDOW_YEARS, MIN_START_DATE.year)
     try:
@@ -223,9 +379,18 @@ def take_break():
 
 def create_driver():
     options = Options()
+    # Return from get() at DOMContentLoaded — the table HTML is all we
+    # need, no point waiting for images/fonts/analytics to finish
+    options.page_load_strategy = "eager"
     if HEADLESS or IS_GITHUB_ACTIONS:
         options.add_argument("--headless")
-    options.set_preference("general.useragent.override", "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0")
+    options.set_preference("general.useragent.override", USER_AGENT)
+    # Only the table text matters — skip images, fonts, notifications,
+    # and media to cut per-page bytes on the bandwidth-limited CI runner
+    options.set_preference("permissions.default.image", 2)
+    options.set_preference("browser.display.use_document_fonts", 0)
+    options.set_preference("dom.webnotifications.enabled", False)
+    options.set_preference("media.autoplay.default", 5)
     if USE_PROXY:
         options.set_preference("network.proxy.type", 1)
         options.set_preference("network.proxy.socks", PROXY_HOST)
@@ -237,60 +402,342 @@ def create_driver():
     driver.set_page_load_timeout(int(os.environ.get("PAGE_LOAD_TIMEOUT", "180")))
     return driver
 
+def buffer_record(d, batch_buffer, seen_doc_numbers):
+    """Queue a scraped row unless its doc number was already buffered/pushed.
+
+    Duplicates (retried pages, window-boundary overlap) would otherwise
+    still cost a btree lookup + conflict resolution server-side.
+    """
+    doc_no = d.get('Doc_Number')
+    if not doc_no or doc_no in seen_doc_numbers or doc_no in batch_buffer:
+        return False
+    batch_buffer[doc_no] = d
+    return True
+
+def open_csv_writer():
+    """Open OUTPUT_FILE once for the session. Returns (file, DictWriter)."""
+    # 1 MiB user-space buffer; append so restarts keep prior rows
+    f = open(OUTPUT_FILE, 'a', newline='', buffering=1 << 20)
+    writer = csv.DictWriter(f, fieldnames=FIELDNAMES, extrasaction='ignore')
+    if os.fstat(f.fileno()).st_size == 0:
+        writer.writeheader()
+    return f, writer
+
+def flush_batch(batch_buffer, seen_doc_numbers, csv_writer=None):
+    if csv_writer is not None:
+        csv_writer.writerows(batch_buffer.values())
+    batch_push_to_db(batch_buffer)
+    seen_doc_numbers.update(batch_buffer)
+    # Keep the cross-flush dedup set bounded
+    if len(seen_doc_numbers) > SEEN_DOCS_MAX:
+        seen_doc_numbers.clear()
+    batch_buffer.clear()
+
+_DATE_RE = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+
+def parse_recorded_date(raw):
+    """MM/DD/YYYY -> date, or None if missing/unparseable."""
+    if not raw:
+        return None
+    # Regex check up front: a miss costs a failed match, not a raised
+    # ValueError out of strptime
+    m = _DATE_RE.match(raw)
+    if not m:
+        return None
+    month, day, year = map(int, m.groups())
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+# XPaths used on every page, built once
+ROWS_XPATH = "//table//tbody//tr"
+CONSENT_BTN_XPATH = "//button[contains(text(), 'Accept') or contains(text(), 'Close')]"
+NEXT_BTN_XPATHS = ("//button[contains(@aria-label, 'Next')]", "(//nav//button)[last()]")
+# Whichever next-button selector matched last page; tried first next time
+_last_next_sel = None
+
+# Selectors built once at import instead of 12 f-strings per row
+_EXTRACTORS = tuple(
+    (f"td.{col_class}, td[class*='{col_class}']", field)
+    for col_class, field in COLUMN_MAP.items()
+)
+
 def extract_row_data(row):
-    data = {}
-    for col_class, field in COLUMN_MAP.items():
-        try:
-            cell = row.find_element(By.CSS_SELECTOR, f"td.{col_class}, td[class*='{col_class}']")
-            data[field] = cell.text.strip()
-        except: data[field] = ""
+    data = dict.fromkeys(FIELDNAMES, "")
+    for sel, field in _EXTRACTORS:
+        # find_elements returns [] on a miss — no exception to raise and
+        # swallow for every sparse cell
+        cells = row.find_elements(By.CSS_SELECTOR, sel)
+        if cells:
+            data[field] = cells[0].text.strip()
+    data['Recorded_Date_ISO'] = parse_recorded_date(data.get('Recorded_Date'))
     return data
 
+# Runs inside the page: all rows, all 12 cells, one Marionette round-trip
+# (vs 12 find_element IPC calls per row)
+_ROW_EXTRACT_JS = """
+return Array.from(document.querySelectorAll('table tbody tr')).map(tr => {
+  const o = {};
+  for (const td of tr.children) {
+    const k = [...td.classList].find(c => c.startsWith('col-'));
+    if (k) o[k] = td.innerText.trim();
+  }
+  return o;
+});
+"""
+
+def extract_page_data(driver):
+    """Read every row on the page with one execute_script call.
+
+    Returns None if the script fails so the caller can fall back to
+    per-row extraction.
+    """
+    try:
+        raw_rows = driver.execute_script(_ROW_EXTRACT_JS)
+    except WebDriverException:
+        return None
+    records = []
+    for raw in raw_rows:
+        d = {field: (raw.get(col_class) or "").strip() for col_class, field in COLUMN_MAP.items()}
+        d['Recorded_Date_ISO'] = parse_recorded_date(d.get('Recorded_Date'))
+        records.append(d)
+    return records
+
+# =============================================================================
+# API SCRAPING
+# =============================================================================
+
+def client_kwargs():
+    kwargs = {
+        'http2': True,
+        'headers': {
+            'User-Agent': USER_AGENT,
+            'Accept': 'application/json',
+            'Referer': 'https://bexar.tx.publicsearch.us/'
+        },
+        'timeout': 60,
+        'follow_redirects': True
+    }
+    if USE_PROXY:
+        kwargs['proxy'] = f"socks5h://{PROXY_HOST}:{PROXY_PORT}"
+    return kwargs
+
+def bootstrap_cookies(url):
+    """One real browser visit to collect anti-bot cookies. Returns {name: value}."""
+    print("🍪 Bootstrapping session cookies via browser...")
+    driver = create_driver()
+    try:
+        driver.get(url)
+        sleep(5)
+        return {c['name']: c['value'] for c in driver.get_cookies()}
+    except Exception as e:
+        print(f"⚠️  Cookie bootstrap failed: {e}")
+        return {}
+    finally:
+        driver.quit()
+
+def map_api_result(item):
+    d = {}
+    for field, key in API_FIELD_MAP.items():
+        v = item.get(key, "")
+        if isinstance(v, (list, tuple)):
+            v = "; ".join(str(x) for x in v if x)
+        d[field] = str(v).strip() if v is not None else ""
+    # API dates come back ISO; keep the MM/DD/YYYY shape the rest of the
+    # pipeline (and the existing CSVs) expect, and parse the real date once
+    # here so the DB flush never has to
+    raw = d.get('Recorded_Date', "")
+    d['Recorded_Date_ISO'] = None
+    if raw and "-" in raw:
+        try:
+            dt = datetime.strptime(raw[:10], "%Y-%m-%d")
+            d['Recorded_Date'] = dt.strftime("%m/%d/%Y")
+            d['Recorded_Date_ISO'] = dt.date()
+        except ValueError: pass
+    elif raw:
+        d['Recorded_Date_ISO'] = parse_recorded_date(raw)
+    return d
+
+def api_params(start_date, end_date, offset):
+    return {
+        'department': 'RP',
+        'docTypes': 'DEED',
+        'limit': RECORDS_PER_PAGE,
+        'offset': offset,
+        'recordedDateRange': f"{start_date},{end_date}",
+        'searchType': 'advancedSearch',
+        'sort': 'desc',
+        'sortBy': 'recordedDate'
+    }
+
+async def fetch_page(client, sem, start_date, end_date, offset):
+    """Fetch one 250-row results page as JSON. Returns a list of record dicts.
+
+    Raises on transport problems (non-2xx, bad JSON) and on unrecognized
+    response shapes, so the caller can tell a broken endpoint apart from
+    a well-formed empty page — the latter just means the window is drained.
+    """
+    async with sem:
+        # Politeness jitter; overlapped across in-flight workers
+        await asyncio.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
+        resp = await client.get(API_URL, params=api_params(start_date, end_date, offset))
+        resp.raise_for_status()
+        payload = resp.json()
+    if isinstance(payload, list):
+        return [map_api_result(item) for item in payload]
+    if isinstance(payload, dict):
+        for key in ('results', 'data'):
+            if key in payload:
+                return [map_api_result(item) for item in (payload[key] or [])]
+    raise ValueError(f"Unexpected API response shape: {type(payload).__name__}")
+
 # =============================================================================
 # MAIN
 # =============================================================================
 
-def main():
-    print("="*60)
-    print("Bexar Scraper: DB-Driven Mode")
-    print("="*60)
-    
-    init_db()
-    
-    state = load_state()
-    current_end_date = state.get('current_end_date', DEFAULT_END_DATE)
-    current_offset = state.get('current_offset', 0)
-    
-    # 1. Check DB State for Window Logic
-    db_count, oldest_db_date = get_db_stats()
-    print(f"DB Records: {db_count:,}")
-    if oldest_db_date:
-        print(f"Oldest Record: {oldest_db_date}")
-    
-    # Force slide if DB has > 9500 records and we haven't already slid past the default
-    if db_count >= OFFSET_LIMIT:
-        print("\n🛑 DB record count > 9500. Checking Window Slide...")
-        if oldest_db_date and oldest_db_date != DEFAULT_END_DATE:
-            # If current_end_date is "newer" than oldest_db_date, it means we haven't slid down yet
-            # Or if we just want to ensure we are always chasing the oldest date
-            if current_end_date > oldest_db_date:
-                print(f"🔄 Sliding Window: {current_end_date} -> {oldest_db_date}")
-                current_end_date = oldest_db_date
-                current_offset = 0 # Reset offset when window moves
-                save_state(current_end_date, current_offset)
-            else:
-                print("✓ Window already aligned with oldest DB date.")
-    
+async def _api_session(current_end_date, current_offset):
+    page_num = (current_offset // RECORDS_PER_PAGE) + 1
+    start_date = get_start_date(current_end_date)
+
+    print(f"📅 Active Window: {start_date} to {current_end_date}")
+    print(f"📄 Start Page: {page_num} (Offset: {current_offset})")
+
+    sem = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    bootstrapped = False
+    pages_session = 0
+    batch_buffer = {}
+    seen_doc_numbers = set()
+    csv_file, csv_writer = open_csv_writer()
+    # False = the endpoint looks broken and the caller should fall back
+    # to the browser path instead of finishing green with nothing
+    api_ok = True
+
+    try:
+        async with httpx.AsyncClient(**client_kwargs()) as client:
+            while True:
+                if MAX_PAGES_PER_SESSION > 0 and pages_session >= MAX_PAGES_PER_SESSION:
+                    print("⏸️  Session limit reached.")
+                    break
+
+                # The window narrows after every wave, so offsets stay
+                # shallow — deep OFFSET costs the server O(offset) and
+                # caps out at ~10k rows per window
+                start_date = get_start_date(current_end_date)
+
+                # One wave = up to ASYNC_CONCURRENCY offsets in flight at once
+                wave_end = current_offset + ASYNC_CONCURRENCY * RECORDS_PER_PAGE
+                offsets = list(range(current_offset, wave_end, RECORDS_PER_PAGE))
+                if MAX_PAGES_PER_SESSION > 0:
+                    offsets = offsets[:MAX_PAGES_PER_SESSION - pages_session]
+
+                print(f"\n--- Pages {page_num}-{page_num + len(offsets) - 1} (Offsets {offsets[0]}-{offsets[-1]}) ---")
+
+                try:
+                    pages = await asyncio.gather(*[
+                        fetch_page(client, sem, start_date, current_end_date, o) for o in offsets
+                    ])
+                except Exception as e:
+                    print(f"⚠️  API fetch failed: {e}")
+                    if not bootstrapped:
+                        # Likely missing anti-bot cookies; prime once and retry
+                        bootstrapped = True
+                        for name, value in bootstrap_cookies(URL_TEMPLATE.format(start_date=start_date, end_date=current_end_date)).items():
+                            client.cookies.set(name, value)
+                        continue
+                    api_ok = False
+                    break
+
+                exhausted = False
+                min_date_seen = None
+                for records in pages:
+                    if not records:
+                        print("No rows found.")
+                        exhausted = True
+                        break
+
+                    count = 0
+                    for d in records:
+                        if buffer_record(d, batch_buffer, seen_doc_numbers):
+                            count += 1
+                        r_date = d.get('Recorded_Date_ISO')
+                        if r_date and (min_date_seen is None or r_date < min_date_seen):
+                            min_date_seen = r_date
+
+                    print(f"  ✓ +{count} records")
+                    pages_session += 1
+                    page_num += 1
+
+                # CSV + DB Push
+                if len(batch_buffer) >= BATCH_SIZE:
+                    flush_batch(batch_buffer, seen_doc_numbers, csv_writer)
+
+                if exhausted:
+                    # The window [start_date, end] is fully drained — hop
+                    # past its start instead of deepening the offset or
+                    # re-saving a dead cursor (same wedge class as the
+                    # offset-cap fix in the browser path)
+                    pages_session += 1
+                    current_offset = 0
+                    page_num = 1
+                    if start_date <= SHARD_START_DATE:
+                        print("🏁 Shard floor reached — nothing left to scrape.")
+                        save_state(current_end_date, current_offset)
+                        break
+                    current_end_date = previous_day(start_date)
+                    save_state(current_end_date, current_offset)
+                    continue
+
+                # Keyset-style advance: pull the window's end down to the
+                # oldest date seen and restart at offset 0 (the dedup set
+                # absorbs the boundary-date overlap). Only page deeper when
+                # a whole wave lands inside a single day.
+                if min_date_seen:
+                    new_end = min_date_seen.strftime("%Y%m%d")
+                    if new_end != current_end_date:
+                        current_end_date = new_end
+                        current_offset = 0
+                        page_num = 1
+                    else:
+                        current_offset += len(offsets) * RECORDS_PER_PAGE
+                else:
+                    current_offset += len(offsets) * RECORDS_PER_PAGE
+
+                maybe_save_state(current_end_date, current_offset)
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        api_ok = False
+    finally:
+        if batch_buffer:
+            flush_batch(batch_buffer, seen_doc_numbers, csv_writer)
+        csv_file.close()
+        save_state(current_end_date, current_offset)
+
+    return api_ok
+
+
+def run_api_session(current_end_date, current_offset):
+    return asyncio.run(_api_session(current_end_date, current_offset))
+
+
+def run_browser_session(current_end_date, current_offset, oldest_db_date=None):
+    global _last_next_sel
     page_num = (current_offset // RECORDS_PER_PAGE) + 1
     start_date = get_start_date(current_end_date)
     url = URL_TEMPLATE.format(start_date=start_date, end_date=current_end_date) + f"&offset={current_offset}"
-    
+
     print(f"📅 Active Window: {start_date} to {current_end_date}")
     print(f"📄 Start Page: {page_num} (Offset: {current_offset})")
-    
+
     driver = create_driver()
     pages_session = 0
-    batch_buffer = []
+    batch_buffer = {}
+    seen_doc_numbers = set()
+    min_date_seen = None
+    csv_file, csv_writer = open_csv_writer()
     
     def safe_get(u, attempts=3):
         last = None
@@ -314,7 +761,7 @@ def main():
             raise RuntimeError("Initial navigation failed")
         sleep(5)
         try:
-            for btn in driver.find_elements(By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'Close')]"):
+            for btn in driver.find_elements(By.XPATH, CONSENT_BTN_XPATH):
                 btn.click()
                 sleep(1)
         except: pass
@@ -327,10 +774,17 @@ def main():
                 
             print(f"\n--- Page {page_num} (Rel Offset: {current_offset}) ---")
             
-            # Mid-session limit check (using offset as proxy for 10k limit)
+            # Approaching the ~10k offset cap: pull the window down to the
+            # oldest date seen so the next run restarts shallow. Before any
+            # page was scraped this session, fall back to the DB's oldest
+            # record — re-saving the capped state unchanged would wedge
+            # every future run
             if current_offset >= OFFSET_LIMIT:
-                print("🛑 Limit approaching mid-session.")
-                # We stop here so next run performs the DB slide check
+                print("🛑 Offset cap reached — narrowing window.")
+                new_end = min_date_seen.strftime("%Y%m%d") if min_date_seen else oldest_db_date
+                if new_end and new_end != current_end_date:
+                    current_end_date = new_end
+                current_offset = 0
                 save_state(current_end_date, current_offset)
                 break
 
@@ -338,7 +792,10 @@ def main():
                 take_break()
             
             try:
-                WebDriverWait(driver, 60).until(EC.presence_of_element_located((By.XPATH, "//table//tbody//tr")))
+                # The wait itself returns the rows — no second find_elements
+                rows = WebDriverWait(driver, 60).until(
+                    lambda d: d.find_elements(By.XPATH, ROWS_XPATH) or False
+                )
             except TimeoutException:
                 print("⚠️  Timeout - Error/Limit?")
                 page_text = driver.page_source
@@ -349,51 +806,69 @@ def main():
                     if len(raw_snippet) > 400:
                         snippet += "..."
                     print(f"🛑 Limit hit! Snippet: {snippet}")
-                    # Save state at LIMIT so next run forces slide
-                    save_state(current_end_date, OFFSET_LIMIT)
+                    # Narrow the window so the next run restarts shallow;
+                    # same oldest-record fallback as the offset-cap branch
+                    new_end = min_date_seen.strftime("%Y%m%d") if min_date_seen else oldest_db_date
+                    if new_end and new_end != current_end_date:
+                        current_end_date = new_end
+                    current_offset = 0
+                    save_state(current_end_date, current_offset)
                     break
                 driver.refresh()
                 sleep(10)
                 continue
 
-            rows = driver.find_elements(By.XPATH, "//table//tbody//tr")
             if not rows:
                 print("No rows found.")
                 break
                 
+            records = extract_page_data(driver)
+            if records is None:
+                # In-page script failed; fall back to per-row extraction
+                records = []
+                for row in rows:
+                    try:
+                        records.append(extract_row_data(row))
+                    except: pass
+
             count = 0
-            for row in rows:
-                try:
-                    d = extract_row_data(row)
-                    if d.get('Doc_Number'):
-                        batch_buffer.append(d)
-                        count += 1
-                except: pass
+            for d in records:
+                if buffer_record(d, batch_buffer, seen_doc_numbers):
+                    count += 1
+                r_date = d.get('Recorded_Date_ISO')
+                if r_date and (min_date_seen is None or r_date < min_date_seen):
+                    min_date_seen = r_date
             
             print(f"  ✓ +{count} records")
             
-            # DB Push
+            # CSV + DB Push
             if len(batch_buffer) >= BATCH_SIZE:
-                batch_push_to_db(batch_buffer)
-                batch_buffer = []
+                flush_batch(batch_buffer, seen_doc_numbers, csv_writer)
             
             current_offset += RECORDS_PER_PAGE
             page_num += 1
-            save_state(current_end_date, current_offset)
+            maybe_save_state(current_end_date, current_offset)
             
             try:
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                sleep(1)
                 next_btn = None
-                for sel in ["//button[contains(@aria-label, 'Next')]", "(//nav//button)[last()]"]:
+                selectors = NEXT_BTN_XPATHS
+                if _last_next_sel and _last_next_sel != selectors[0]:
+                    selectors = (_last_next_sel,) + tuple(s for s in NEXT_BTN_XPATHS if s != _last_next_sel)
+                for sel in selectors:
                     btns = driver.find_elements(By.XPATH, sel)
                     if btns and btns[-1].is_enabled():
                         next_btn = btns[-1]
+                        _last_next_sel = sel
                         break
                 if next_btn:
+                    old_first_row = rows[0]
                     next_btn.click()
-                    sleep(3)
-                    random_delay()
+                    # Proceed the instant the new rows render instead of
+                    # sleeping a fixed 4s+ per page
+                    WebDriverWait(driver, 30).until(EC.staleness_of(old_first_row))
+                    WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.XPATH, ROWS_XPATH)))
+                    sleep(random.uniform(1, 3))
                 else: break
             except: break
 
@@ -403,11 +878,48 @@ def main():
         print(f"\n❌ Error: {e}")
     finally:
         if batch_buffer:
-            batch_push_to_db(batch_buffer)
-        
+            flush_batch(batch_buffer, seen_doc_numbers, csv_writer)
+
+        csv_file.close()
         save_state(current_end_date, current_offset)
         driver.quit()
-        print("Done.")
+
+
+def main():
+    print("="*60)
+    print("Bexar Scraper: DB-Driven Mode")
+    print("="*60)
+
+    init_db()
+
+    if WINDOW_ID is not None:
+        print(f"🧩 Worker {WINDOW_ID}/{WINDOW_COUNT}: {SHARD_START_DATE} to {SHARD_END_DATE}")
+
+    state = load_state()
+    current_end_date = state.get('current_end_date', SHARD_END_DATE)
+    current_offset = state.get('current_offset', 0)
+
+    # 1. DB state (informational — the date cursor in scraper_state.json
+    # drives pagination now, so no forced window slide is needed)
+    db_count, oldest_db_date = get_db_stats()
+    print(f"DB Records: {db_count:,}")
+    if oldest_db_date:
+        print(f"Oldest Record: {oldest_db_date}")
+
+    if USE_API:
+        if not run_api_session(current_end_date, current_offset):
+            # Endpoint down or its shape changed: finish the session on the
+            # browser path rather than exiting green with nothing scraped
+            print("\n↩️  API mode failed — falling back to browser session.")
+            state = load_state()
+            run_browser_session(state.get('current_end_date', current_end_date),
+                                state.get('current_offset', 0), oldest_db_date)
+    else:
+        run_browser_session(current_end_date, current_offset, oldest_db_date)
+
+    promote_records()
+    close_conn()
+    print("Done.")
 
 if __name__ == "__main__":
     main()